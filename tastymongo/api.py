@@ -1,8 +1,10 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from pyramid.interfaces import IRoutesMapper
 from pyramid.response import Response
 from pyramid.settings import asbool
+from pyramid.traversal import quote_path_segment
 
 from . import http
 from .exceptions import NotRegistered, ConfigurationError, NotFound
@@ -30,6 +32,7 @@ class Api( object ):
         self.api_name = api_name
         self.api_version = api_version
         self._registry = {}
+        self._uri_templates = {}
 
         if asbool( config.registry.settings.get( 'tastymongo.enable_CORS', 'false' ) ):
             self.enable_CORS = True
@@ -47,6 +50,8 @@ class Api( object ):
         self.config = config
 
         self.route = '/{}/{}'.format( self.api_name, self.api_version )
+        # Resource uris look like '/api/v1/<resource_name>/<id>/'
+        self._resource_uri_prefix = self.route + '/'
 
         self.config.add_route( self.route, self.route + '/' )
         self.config.add_view( self.wrap_view( self, self.top_level ), route_name=self.route )
@@ -178,12 +183,24 @@ class Api( object ):
         self.config.add_route( single_name, '{}/{}/{{id}}/'.format( self.route, resource_name ) )
         self.config.add_view( self.wrap_view( resource, resource.dispatch_single ), route_name=single_name )
 
+    def register_many( self, resources ):
+        """
+        Registers each of the ``Resource`` instances in `resources` with the API.
+
+        @type resources: list
+        """
+        for resource in resources:
+            self.register( resource )
+
     def unregister(self, resource_name):
         """
         If present, unregisters a resource from the API.
         """
         if resource_name in self._registry:
             del(self._registry[resource_name])
+
+            for operation in ( 'schema', 'list', 'single' ):
+                self._uri_templates.pop( ( resource_name, operation ), None )
         else:
             raise NotRegistered( "No resource was registered for resource_name='{}'.".format( resource_name ) )
 
@@ -234,16 +251,48 @@ class Api( object ):
         return route_name
 
     def get_id_from_resource_uri( self, value ):
-        if isinstance( value, basestring ) and value.startswith( self.route ):
+        if isinstance( value, basestring ):
             # '/api/v1/<resource_name>/<objectid>/' or some other string
-            parts = value.split( '/' )
-            if len( parts ) == 6:
-                return parts[-2]
+            if value.startswith( self._resource_uri_prefix ) and value.endswith( '/' ):
+                bits = value[ len( self._resource_uri_prefix ):-1 ].split( '/' )
+                if len( bits ) == 2 and bits[0] and bits[1]:
+                    return bits[1]
 
         return None
 
+    def _get_uri_template( self, resource_name, operation ):
+        '''
+        Returns the pattern of the route for `resource_name` and `operation`
+        (including any route prefix), for `build_uri` to fill in directly. Returns
+        None when the route needs pyramid's own url generation: it has a
+        pregenerator, or placeholders other than a plain `{id}`.
+        '''
+        key = ( resource_name, operation )
+
+        if key not in self._uri_templates:
+            mapper = self.config.registry.queryUtility( IRoutesMapper )
+            route = mapper and mapper.get_route( self.build_route_name( resource_name, operation ) )
+            if route is None:
+                # Not registered (yet); don't remember that
+                return None
+
+            template = None
+            plain_pattern = route.pattern.replace( '{id}', '' )
+            if route.pregenerator is None and '{' not in plain_pattern and '}' not in plain_pattern:
+                template = route.pattern if route.pattern.startswith( '/' ) else '/' + route.pattern
+
+            self._uri_templates[ key ] = template
+
+        return self._uri_templates[ key ]
+
     def build_uri( self, request, id=None, resource_name=None, operation='single', route_name=None, absolute=False ):
         if route_name is None:
+            template = None if absolute else self._get_uri_template( resource_name, operation )
+            if template is not None:
+                # Relative uris for registered resources are a plain substitution
+                # on the route pattern; skip pyramid's route lookup and generation.
+                return request.script_name + template.format( id=quote_path_segment( unicode( id ) ) )
+
             route_name = self.build_route_name( resource_name, operation )
 
         if absolute:
@@ -9,8 +9,8 @@ class Bundle( object ):
     A small container for instances and converted data for the
     `dehydrate/hydrate` cycle.
     """
-    def __init__( self, obj=None, data=None, request=None ):
-        if isinstance( obj, Document ) and hasattr( request, 'cache' ) and obj.pk:
+    def __init__( self, obj=None, data=None, request=None, cache=True ):
+        if cache and isinstance( obj, Document ) and hasattr( request, 'cache' ) and obj.pk:
             obj = request.cache.add( obj )
 
         self.obj = obj
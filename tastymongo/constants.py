@@ -9,11 +9,11 @@ ALL_WITH_RELATIONS = 2
 
 # FIXME: Query terms should be exposed by MongoEngine like in Django.
 # Valid query terms:
-QUERY_EQUALITY_OPERATORS = { 'exact', 'ne', 'gt', 'gte', 'lt', 'lte' }
-QUERY_LIST_OPERATORS = { 'in', 'nin', 'all' }
+QUERY_EQUALITY_OPERATORS = frozenset(( 'exact', 'ne', 'gt', 'gte', 'lt', 'lte' ))
+QUERY_LIST_OPERATORS = frozenset(( 'in', 'nin', 'all' ))
 # QUERY_GEO_OPERATORS = ['within_distance', 'within_spherical_distance', 'within_box', 'within_polygon', 'near', 'near_sphere']
-QUERY_MATCH_OPERATORS = { 'contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith', 'iexact' }
+QUERY_MATCH_OPERATORS = frozenset(( 'contains', 'icontains', 'startswith', 'istartswith', 'endswith', 'iendswith', 'iexact' ))
 
-QUERY_TERMS = { 'size', 'exists' } | QUERY_EQUALITY_OPERATORS | QUERY_LIST_OPERATORS | QUERY_MATCH_OPERATORS
+QUERY_TERMS = frozenset(( 'size', 'exists' )) | QUERY_EQUALITY_OPERATORS | QUERY_LIST_OPERATORS | QUERY_MATCH_OPERATORS
 
 LOOKUP_SEP = '__'
\ No newline at end of file
@@ -33,6 +33,20 @@ except ImportError:
         return True
 
 
+def _to_object_id( api, value ):
+    '''
+    Returns the ObjectId for `value`, which is either an id or a resource uri on `api` (if given).
+    '''
+    if isinstance( value, ObjectId ):
+        return value
+
+    if isinstance( value, basestring ) and len( value ) == 24:
+        # A plain id; resource uris are always longer
+        return ObjectId( value )
+
+    return ObjectId( ( api and api.get_id_from_resource_uri( value ) ) or value )
+
+
 # All the ApiField variants.
 
 class ApiField( object ):
@@ -188,11 +202,7 @@ class ObjectIdField( ApiField ):
     def convert_from_string( self, value ):
         if value is None:
             return None
-        if isinstance( value, ObjectId ):
-            return value
-        if self._resource:
-            return ObjectId( self._resource._meta.api.get_id_from_resource_uri( value ) or value )
-        return ObjectId( value )
+        return _to_object_id( self._resource and self._resource._meta.api, value )
 
     def dehydrate( self, bundle ):
         return bundle.obj.id
@@ -616,7 +626,7 @@ class ToOneField( RelatedField ):
         if isinstance( value, dict ):
             # we have a dict with a DBRef
             return value['_ref'].id
-        return ObjectId( self._resource._meta.api.get_id_from_resource_uri( value ) or value )
+        return _to_object_id( self._resource._meta.api, value )
 
     def hydrate( self, bundle ):
         """
@@ -714,9 +724,9 @@ class ToManyField( RelatedField ):
 
     def convert_from_string( self, value ):
         if isinstance( value, list ):
-            return [ ( isinstance( elem, ObjectId ) and elem ) or ObjectId( self._resource._meta.api.get_id_from_resource_uri( elem ) or elem ) or elem for elem in value ]
+            return [ _to_object_id( self._resource._meta.api, elem ) for elem in value ]
         else:
-            return ( isinstance( value, ObjectId ) and value ) or ObjectId( self._resource._meta.api.get_id_from_resource_uri( value ) or value )
+            return _to_object_id( self._resource._meta.api, value )
 
     def hydrate( self, bundle ):
         '''
@@ -13,7 +13,7 @@ from .throttle import BaseThrottle
 from .paginator import Paginator
 
 from pyramid.response import Response
-from mongoengine.queryset import DoesNotExist, MultipleObjectsReturned, Q
+from mongoengine.queryset import DoesNotExist, MultipleObjectsReturned, Q, QuerySet
 from mongoengine.errors import ValidationError as MongoEngineValidationError
 
 try:
@@ -42,6 +42,26 @@ UTF8Writer = getwriter('utf8')
 sys.stdout = UTF8Writer(sys.stdout)
 
 
+# The api field class for each MongoEngine field class that doesn't map to the default StringField, see
+# `DocumentResource.get_api_field_for_mongoengine_field`. ListFields depend on their item field, so they aren't here.
+_API_FIELD_FOR_MONGOENGINE_FIELD = {
+    mongofields.ObjectIdField: fields.ObjectIdField,
+    mongofields.ReferenceField: fields.ToOneField,
+    mongofields.GenericReferenceField: fields.ToOneField,
+    mongofields.BooleanField: fields.BooleanField,
+    mongofields.FloatField: fields.FloatField,
+    mongofields.DecimalField: fields.DecimalField,
+    mongofields.IntField: fields.IntegerField,
+    mongofields.SequenceField: fields.IntegerField,
+    mongofields.DictField: fields.DictField,
+    mongofields.MapField: fields.DictField,
+    mongofields.EmbeddedDocumentField: fields.EmbeddedDocumentField,
+    mongofields.DateTimeField: fields.DateTimeField,
+    mongofields.ComplexDateTimeField: fields.DateTimeField,
+    mongofields.GeoPointField: fields.ListField,
+}
+
+
 class ResourceOptions( object ):
     """
     A configuration class for `Resource`.
@@ -71,6 +91,7 @@ class ResourceOptions( object ):
     use_absolute_uris = False
     return_data_on_post = True
     return_data_on_put = True
+    use_projection = False
 
     def __new__( cls, meta=None ):
         overrides = {}
@@ -90,9 +111,9 @@ class ResourceOptions( object ):
         if overrides.get( 'single_allowed_methods', None ) is None:
             overrides['single_allowed_methods'] = allowed_methods
 
-        # We accept the meta.filtering as two types: a list of fields on which we allow all filter types, or a dict
-        # of fields specifying each allowed filter type. If we get a list, change it to a dict here.
-        if  isinstance( overrides.get( 'filtering', None ),  ( list, tuple, set ) ):
+        # We accept the meta.filtering as two types: a list (or tuple, set) of fields on which we allow all filter types,
+        # or a dict of fields specifying each allowed filter type. If we get a list, change it to a dict here.
+        if  isinstance( overrides.get( 'filtering', None ),  ( list, tuple, set, frozenset ) ):
             filtering_dict = {}
             for field in overrides[ 'filtering' ]:
                 filtering_dict[ field ] = ALL
@@ -173,6 +194,9 @@ class Resource( object ):
     def __init__( self, api=None ):
         self.fields = { k: copy( v ) for k, v in self.base_fields.items() }
 
+        # Filter expressions that passed `check_filtering`, see `_compile_filter`
+        self._filter_recipes = {}
+
         if api:
             self._meta.api = api
 
@@ -419,7 +443,7 @@ class Resource( object ):
         """
         return data
 
-    def build_bundle( self, request, obj=None, data=None ):
+    def build_bundle( self, request, obj=None, data=None, cache=True ):
         """
         Given either an object, a data dictionary or both, builds a `Bundle`
         for use throughout the `dehydrate/hydrate` cycle.
@@ -436,6 +460,9 @@ class Resource( object ):
 
         Errors are added to the bundle if a new resource may not be created or 
         if an existing resource is not found or may not be updated.
+
+        Pass `cache=False` to keep `obj` out of the request's document cache,
+        i.e. when it's only partially loaded.
         """
         if isinstance( data, basestring ):
             # Assume data /is/ the uri
@@ -448,12 +475,19 @@ class Resource( object ):
         if obj is None:
             obj = self._meta.object_class()
 
-        bundle = Bundle( obj=obj, data=data, request=request )
+        bundle = Bundle( obj=obj, data=data, request=request, cache=cache )
         if len( bundle.data ) > 1:
             bundle.uri_only = False
 
         return bundle
 
+    def apply_projection( self, obj_list ):
+        '''
+        A hook to limit the data that gets loaded for each object in `obj_list`
+        to what the resource's fields need.
+        '''
+        return obj_list
+
     def pre_hydrate( self, bundles, request ):
         '''
         A hook for allowing some custom hydration on the data specific to this
@@ -480,18 +514,20 @@ class Resource( object ):
             bundles = [ bundles ]
 
         bundles = self.pre_hydrate( bundles, request )
+        is_partial = request.method.lower() in ( 'patch', 'put' )
+        callbacks = self._get_field_callbacks( 'hydrate' )
 
         for bundle in bundles:
             for field_name, fld in self.fields.items():
 
-                if ( request.method.lower() == 'patch' or request.method.lower() == 'put' ) and field_name not in bundle.data:
+                if is_partial and field_name not in bundle.data:
                     # When patching, ignore values not present in the data
                     continue
 
                 # You may provide a custom method on the resource that will replace
                 # the default hydration behaviour for the field.
-                callback = getattr(self, "hydrate_{0}".format(field_name), None)
-                if callable( callback ):
+                callback = callbacks.get( field_name )
+                if callback:
                     data = callback( bundle )
                 elif fld.readonly:
                     continue
@@ -524,6 +560,20 @@ class Resource( object ):
 
         return bundles
 
+    def _get_field_callbacks( self, prefix ):
+        '''
+        Returns the optional `<prefix>_<field>` methods of this resource by field
+        name, so `hydrate` and `dehydrate` look them up once per call rather than
+        for every field of every bundle.
+        '''
+        callbacks = {}
+        for field_name in self.fields:
+            callback = getattr( self, "{0}_{1}".format( prefix, field_name ), None )
+            if callable( callback ):
+                callbacks[ field_name ] = callback
+
+        return callbacks
+
     def save( self, bundle ):
         raise NotImplementedError()
 
@@ -540,14 +590,16 @@ class Resource( object ):
         if not single_bundle and hasattr( self, '_prefetch_documents' ):
             self._prefetch_documents( bundles, request )
 
+        callbacks = self._get_field_callbacks( 'dehydrate' )
+
         for bundle in bundles:
             # Dehydrate each field.
             for field_name, fld in self.fields.items():
                 bundle.data[field_name] = fld.dehydrate( bundle )
 
                 # Check for an optional method to do further dehydration.
-                method = getattr( self, "dehydrate_{0}".format( field_name ), None )
-                if callable( method ):
+                method = callbacks.get( field_name )
+                if method:
                     bundle.data[field_name] = method( bundle )
 
         bundles = self.post_dehydrate( bundles, request )
@@ -666,10 +718,13 @@ class Resource( object ):
         """
         objects = self.obj_get_list( request=request, **request.matchdict )
         ordered_objects = self.apply_ordering( objects, options=request.GET.mixed() )
+        projected_objects = self.apply_projection( ordered_objects )
+        # Projected documents are partial, so they shouldn't be reused through the request cache
+        cache = projected_objects is ordered_objects
 
         paginator = self._meta.paginator_class(
             request.GET,
-            ordered_objects,
+            projected_objects,
             resource_uri=self.get_resource_uri( request ),
             limit=self._meta.limit,
             max_limit=self._meta.max_limit,
@@ -677,7 +732,7 @@ class Resource( object ):
         data = paginator.page()
 
         # Create a bundle for every object and dehydrate those bundles individually
-        bundles = [ self.build_bundle( request=request, obj=obj ) for obj in data['objects'] ]
+        bundles = [ self.build_bundle( request=request, obj=obj, cache=cache ) for obj in data['objects'] ]
         bundles = self.dehydrate( bundles, request )
 
         return self.create_response( bundles, data=data, request=request )
@@ -892,11 +947,13 @@ class DocumentResource( Resource ):
     def _prefetch_documents( self, bundles, request ):
         # On bundles, find DBRefs in fields to prefetch
         to_fetch = {}
+        related_fields = []
         for field_name, field in self.fields.items():
             # Per field, loop over the bundles and pick up related docs we could have to dereference.
             if getattr( field, 'is_related', False ) and field.to and field.full:
                 related_resource = self._meta.api.resource_for_class( field.to_class )
                 resource_name = related_resource._meta.resource_name
+                related_fields.append( ( field, resource_name ) )
 
                 if resource_name not in to_fetch:
                     to_fetch[ resource_name ] = set()
@@ -908,14 +965,37 @@ class DocumentResource( Resource ):
                     for bundle in bundles:
                         to_fetch[ resource_name ].add( bundle.obj._data[ field.attribute ] )
 
+        cache = getattr( request, 'cache', None )
+        fetched = {}
+
         for resource_name, related in to_fetch.items():
             # Limit each set to ObjectIds we can't find in the cache yet
-            ids = [ ref.id for ref in related if isinstance( ref, DBRef ) and ref.id not in request.cache ]
+            ids = [ ref.id for ref in related if isinstance( ref, DBRef ) and ( cache is None or ref.id not in cache ) ]
 
             # Fetch the remaining ids
             if len( ids ):
                 related_resource = self._meta.api.resource_by_name( resource_name )
-                docs = request.cache.add( related_resource._meta.object_class.objects( id__in=ids ) )
+                docs = related_resource._meta.object_class.objects( id__in=ids )
+
+                if cache is not None:
+                    cache.add( docs )
+                else:
+                    fetched[ resource_name ] = { doc.pk: doc for doc in docs }
+
+        # Without a document cache, put the fetched documents in place of their
+        # references, so dehydrating doesn't dereference them one at a time.
+        for field, resource_name in related_fields:
+            docs = fetched.get( resource_name )
+            if not docs:
+                continue
+
+            for bundle in bundles:
+                value = bundle.obj._data[ field.attribute ]
+
+                if getattr( field, 'is_tomany', False ):
+                    bundle.obj._data[ field.attribute ] = [ docs.get( ref.id, ref ) if isinstance( ref, DBRef ) else ref for ref in value ]
+                elif isinstance( value, DBRef ):
+                    bundle.obj._data[ field.attribute ] = docs.get( value.id, value )
 
     def _mark_relational_changes( self, bundle, obj=None ):
         '''
@@ -1086,35 +1166,20 @@ class DocumentResource( Resource ):
         MongoEngine type.
 
         """
-        result = default  # instantiated only once by specifying it as kwarg
-
         # Specify only those field types that differ from default StringField
-        if isinstance( f, mongofields.ObjectIdField, ):
-            result = fields.ObjectIdField
-        elif isinstance( f, ( mongofields.ReferenceField, mongofields.GenericReferenceField ) ):
-            result = fields.ToOneField
-        elif isinstance( f, mongofields.BooleanField ):
-            result = fields.BooleanField
-        elif isinstance( f, mongofields.FloatField ):
-            result = fields.FloatField
-        elif isinstance( f, mongofields.DecimalField ):
-            result = fields.DecimalField
-        elif isinstance( f, ( mongofields.IntField, mongofields.SequenceField ) ):
-            result = fields.IntegerField
-        elif isinstance( f, ( mongofields.DictField, mongofields.MapField ) ):
-            result = fields.DictField
-        elif isinstance( f, mongofields.EmbeddedDocumentField ):
-            result = fields.EmbeddedDocumentField
-        elif isinstance( f, ( mongofields.DateTimeField, mongofields.ComplexDateTimeField ) ):
-            result = fields.DateTimeField
-        elif isinstance( f, mongofields.ListField ) and isinstance( f.field, ( mongofields.ReferenceField, mongofields.GenericReferenceField ) ):
-            result = fields.ToManyField
-        elif isinstance( f, ( mongofields.ListField, mongofields.SortedListField, mongofields.GeoPointField ) ):
+        if isinstance( f, mongofields.ListField ):
+            if isinstance( f.field, ( mongofields.ReferenceField, mongofields.GenericReferenceField ) ):
+                return fields.ToManyField
             # This will be lists of simple objects, since references have been
             # discarded already by should_skip_fields. 
-            result = fields.ListField
+            return fields.ListField
 
-        return result
+        # Look up the field's class, or the nearest base class that has an api field
+        for field_class in type( f ).__mro__:
+            if field_class in _API_FIELD_FOR_MONGOENGINE_FIELD:
+                return _API_FIELD_FOR_MONGOENGINE_FIELD[ field_class ]
+
+        return default  # instantiated only once by specifying it as kwarg
 
     @classmethod
     def get_fields( cls, fields=None, excludes=None ):
@@ -1266,6 +1331,27 @@ class DocumentResource( Resource ):
 
         return obj_list.order_by( *order_by_args )
 
+    def apply_projection( self, obj_list ):
+        '''
+        Only load the document fields that back this resource's fields, so
+        MongoDB sends less data and MongoEngine converts fewer values per
+        document.
+
+        Projection is opt-in: set `use_projection = True` on the resource's
+        Meta when its fields and dehydrate methods only read document fields
+        that are exposed as fields. Projected documents are partial, so they're
+        kept out of the request's document cache.
+        '''
+        if not self._meta.use_projection or not hasattr( obj_list, 'only' ):
+            return obj_list
+
+        document_fields = self._meta.object_class._fields
+        only_fields = { 'id' }
+        only_fields.update( fld.attribute for fld in self.fields.values()
+            if isinstance( fld.attribute, basestring ) and fld.attribute in document_fields )
+
+        return obj_list.only( *only_fields )
+
     def get_api_field_for_document_field( self, field_name ):
         """
         Given a field name, we can find this field name on the document, and return an api field.
@@ -1388,6 +1474,63 @@ class DocumentResource( Resource ):
 
         return value
 
+    def _compile_filter( self, filter_expr ):
+        """
+        Parses the filter expression `filter_expr` and checks that it is allowed.
+
+        Returns a tuple `( is_or_filter, filter_type, resource_filters, qs_filter )`,
+        where `resource_filters` is the result of `check_filtering` and `qs_filter`
+        the queryset filter key to use, or None if the expression is not on a
+        field the Resource knows about. The result only depends on the resource
+        definition, so it is cached per expression.
+        """
+        if filter_expr in self._filter_recipes:
+            return self._filter_recipes[ filter_expr ]
+
+        filter_bits = filter_expr.split( LOOKUP_SEP )
+        filter_type = 'exact'  # default
+        field_name = filter_bits.pop( 0 )
+
+        is_or_filter = ( field_name == 'OR' )
+        if is_or_filter:
+            field_name = filter_bits.pop( 0 )
+
+        # Override filter_type if it is given.
+        if len( filter_bits ) and filter_bits[-1].replace('[]', '') in QUERY_TERMS:
+            filter_type = filter_bits.pop().replace('[]', '')
+
+        # Reject match operators on resource fields that aren't strings right away, as `check_filtering` would
+        if filter_type in QUERY_MATCH_OPERATORS and not filter_bits and field_name in self.fields and \
+                not isinstance( self.fields[ field_name ], fields.StringField ):
+            raise InvalidFilterError( "The `{0}` field does not allow filtering with '{1}'.".format( field_name, filter_type ) )
+
+        if field_name not in self.fields:
+            if field_name in self._meta.filtering:
+                # then this field is allowed to be filtered on, even though its excluded from the resource, this
+                # means that we probably want to filter on a field of the document, which we create here:
+                field = self.get_api_field_for_document_field( field_name )
+            else:
+                return None
+        else:
+            field = self.fields[ field_name ]
+
+        # Example:
+        # Books.filter( author__name__icontains='Fred' ) receives:
+        # [ (BookResource, 'author'), (AuthorResource, 'name') ], from 
+        # `check_filtering`, for which we return the filter:
+        #   { 'author__id__in': author_ids }
+        # where `author_ids` is the result set from
+        #   AuthorResource.filter( name__icontains='Fred' )
+        resource_filters = self.check_filtering( field, filter_type, filter_bits )
+
+        # The queryset filter; relational lookups end up filtering on a list of ids
+        qs_filter = "{0}{1}{2}".format( resource_filters[0][1].attribute, LOOKUP_SEP,
+            'in' if len( resource_filters ) > 1 else filter_type )
+
+        recipe = ( is_or_filter, filter_type, resource_filters, qs_filter )
+        self._filter_recipes[ filter_expr ] = recipe
+        return recipe
+
     def build_filters( self, filters, request ):
         """
         Given a dictionary of filters, creates the corresponding ODM filters,
@@ -1432,37 +1575,12 @@ class DocumentResource( Resource ):
         or_filters = []
 
         for filter_expr, value in filters.items():
-            filter_bits = filter_expr.split( LOOKUP_SEP )
-            filter_type = 'exact'  # default
-            field_name = filter_bits.pop( 0 )
-
-            is_or_filter = ( field_name == 'OR' )
-            if is_or_filter:
-                field_name = filter_bits.pop( 0 )
+            recipe = self._compile_filter( filter_expr )
+            if recipe is None:
+                # Not a field the Resource knows about, so ignore it.
+                continue
 
-            if field_name not in self.fields:
-                if field_name in self._meta.filtering:
-                    # then this field is allowed to be filtered on, even though its excluded from the resource, this
-                    # means that we probably want to filter on a field of the document, which we create here:
-                    field = self.get_api_field_for_document_field( field_name )
-                else:
-                    # Not a field the Resource knows about, so ignore it.
-                    continue
-            else:
-                field = self.fields[ field_name ]
-
-            # Override filter_type if it is given.
-            if len( filter_bits ) and filter_bits[-1].replace('[]', '') in QUERY_TERMS:
-                filter_type = filter_bits.pop().replace('[]', '')
-
-            # Example:
-            # Books.filter( author__name__icontains='Fred' ) receives:
-            # [ (BookResource, 'author'), (AuthorResource, 'name') ], from 
-            # `check_filtering`, for which we return the filter:
-            #   { 'author__id__in': author_ids }
-            # where `author_ids` is the result set from
-            #   AuthorResource.filter( name__icontains='Fred' )
-            resource_filters = self.check_filtering( field, filter_type, filter_bits )
+            is_or_filter, filter_type, resource_filters, qs_filter = recipe
             value = resource_filters[-1][0].parse_filter_value( value, resource_filters[-1][1], filter_type )
 
             if len( resource_filters ) > 1:
@@ -1474,9 +1592,6 @@ class DocumentResource( Resource ):
                     filter_type = 'in'
                     value = [ str(d['_id']) for d in resource.obj_get_list( request, **resource_filter ).only( 'id' ).as_pymongo() ]
 
-            # Return the queryset filter
-            qs_filter = "{0}{1}{2}".format( resource_filters[0][1].attribute, LOOKUP_SEP, filter_type )
-
             if is_or_filter:
                 or_filters.append( ( qs_filter, value ) )
             else:
@@ -1494,6 +1609,13 @@ class DocumentResource( Resource ):
         return q_filter
 
     def get_queryset( self, request ):
+        '''
+        Returns a fresh queryset for the resource's documents.
+
+        The queryset doesn't cache its results, so list requests don't keep
+        every document they stream around; iterating it again will query
+        the database again.
+        '''
         qs = None
 
         if hasattr( self._meta, 'queryset' ) and self._meta.queryset:
@@ -1504,6 +1626,9 @@ class DocumentResource( Resource ):
         if qs is None:
             raise NotImplementedError('Resource needs a `queryset` or `object_class` to return objects')
 
+        if isinstance( qs, QuerySet ):
+            qs = qs.no_cache()
+
         return qs
 
     def save( self, bundle ):
@@ -1672,6 +1797,12 @@ class DocumentResource( Resource ):
             # Don't update here. May get updated through _update_relations.
             return bundle
 
+        if bundle.obj in bundle.request.api['created'] and not bundle.obj._get_changed_fields():
+            # Just inserted by `save_new` and untouched since; saving it
+            # again would only repeat the same write.
+            bundle = self._mark_relational_changes( bundle )
+            return self._related_fields_callback( bundle, 'update' )
+
         if RelationManagerMixin and isinstance( bundle.obj, RelationManagerMixin ):
             bundle = self._mark_relational_changes( bundle )
             bundle.obj.save( request=bundle.request, validate=False )
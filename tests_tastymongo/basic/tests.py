@@ -3,29 +3,76 @@ from __future__ import unicode_literals
 
 # from mongoengine_relational import RelationManagerMixin
 import unittest
-import json
-from pyramid import testing
+from copy import copy
 
+from mongoengine import Document
 from pyramid.request import Request
 
-from tests_tastymongo.run_tests import setup_db, setup_request, get_request
+from tests_tastymongo.utils import json_dumps, json_loads
+from tests_tastymongo.run_tests import connect_db, setup_db, setup_request, teardown_request, get_request, insert_documents
 from tests_tastymongo.documents import Activity, Person, Deliverable
 from tastymongo import http
 
 
-class BasicTests( unittest.TestCase ):
+def setUpModule():
+    connect_db()
+
+
+class DocumentCache( dict ):
+    '''
+    A minimal `request.cache`: documents by pk.
+    '''
+    def add( self, docs ):
+        if isinstance( docs, Document ):
+            return self.setdefault( docs.pk, docs )
+
+        for doc in docs:
+            self.setdefault( doc.pk, doc )
 
-    def setUp( self ):
-        self.conn = setup_db()
-        self.data = setup_request()
 
-        # Setup data
-        self.data.a1 = Activity( name='a1', person=self.data.user )
-        self.data.a1.save()
+class BasicTests( unittest.TestCase ):
 
+    @classmethod
+    def setUpClass( cls ):
+        cls.conn = setup_db()
+        cls.setup_test_data()
+
+        # A single pyramid registry, api and set of resources for all tests in this class
+        cls.shared_data = setup_request( user=cls.user )
+
+    @classmethod
+    def tearDownClass( cls ):
+        teardown_request( cls.shared_data )
+        cls.shared_data = None
+
+    @classmethod
+    def setup_test_data( cls ):
+        # Documents shared by all tests in this class; tests should not modify them.
+        # Insert them with pymongo directly, they don't need MongoEngine's validation.
+        cls.user = insert_documents( Person, [ { 'name': 'p1' } ] )[ 0 ]
+        cls.a1 = insert_documents( Activity, [ { 'name': 'a1', 'person': cls.user.pk } ] )[ 0 ]
+        cls.fixture_ids = { Person: [ cls.user.pk ], Activity: [ cls.a1.pk ], Deliverable: [] }
+
+        # The serialized ids tests compare against
+        cls.user_id = unicode( cls.user.id )
+        cls.a1_id = unicode( cls.a1.id )
+
+        # Request bodies that only depend on the fixtures
+        cls.post_list_body = json_dumps({
+            'name': 'post_list created activity',
+            'person': '/api/v1/person/{0}/'.format( cls.user_id )
+        })
+
+    def setUp( self ):
+        # Every test gets its own request
+        self.data = copy( self.shared_data )
+        self.data.request = get_request( self.user )
+        self.data.a1 = self.a1
 
     def tearDown( self ):
-        testing.tearDown()
+        # Remove the documents created during the test, keep the fixtures
+        for document_class, ids in self.fixture_ids.items():
+            document_class._get_collection().delete_many( { '_id': { '$nin': ids } } )
 
         # Clear data
         self.data = None
@@ -49,11 +96,26 @@ class BasicTests( unittest.TestCase ):
         # Get a single activity
         d.request.matchdict = { 'id': self.data.a1.id }
         response = d.activity_resource.dispatch_single( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         # Check if the correct activity has been returned
-        self.assertEqual( deserialized['id'], unicode(self.data.a1.id) )
-        self.assertEqual( deserialized['person'].split('/')[-2], unicode(self.data.user.id) )
+        self.assertEqual( deserialized['id'], self.a1_id )
+        self.assertEqual( d.api.get_id_from_resource_uri( deserialized['person'] ), self.user_id )
+
+    def test_get_single_dehydrate_override( self ):
+        d = self.data
+
+        # A `dehydrate_<field>` method replaces the field's dehydrated value, also when
+        # it's set after the resource was created; the resource is shared, so remove it afterwards
+        d.activity_resource.dehydrate_name = lambda bundle: bundle.data[ 'name' ].upper()
+        self.addCleanup( delattr, d.activity_resource, 'dehydrate_name' )
+
+        d.request.matchdict = { 'id': self.data.a1.id }
+        response = d.activity_resource.dispatch_single( d.request )
+        deserialized = json_loads( response.body )
+
+        self.assertEqual( deserialized['id'], self.a1_id )
+        self.assertEqual( deserialized['name'], 'A1' )
 
     def test_get_list( self ):
         d = self.data
@@ -61,28 +123,70 @@ class BasicTests( unittest.TestCase ):
         # Get a bunch of activities
         d.request.matchdict = {}
         response = d.activity_resource.dispatch_list( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         # Find out if we got multiple activities
         self.assertEqual( len(deserialized['objects']), deserialized['meta']['total_count'] )
 
+    def test_get_list_full( self ):
+        d = self.data
+
+        # Return nested persons; the resource is shared, so reset that afterwards
+        d.activity_resource.fields[ 'person' ].full = True
+        self.addCleanup( setattr, d.activity_resource.fields[ 'person' ], 'full', False )
+
+        a2 = Activity( name='a2', person=d.user )
+        a2.save()
+
+        d.request.matchdict = {}
+        response = d.activity_resource.dispatch_list( d.request )
+        deserialized = json_loads( response.body )
+
+        # The related persons are fetched for the whole list and nested in each activity
+        self.assertEqual( len( deserialized['objects'] ), 2 )
+        for activity in deserialized['objects']:
+            self.assertEqual( activity['person']['id'], self.user_id )
+            self.assertEqual( activity['person']['name'], 'p1' )
+
+    def test_get_list_projected( self ):
+        d = self.data
+
+        # Only load the document fields the resource needs; the resource is shared, so reset that afterwards
+        d.activity_resource._meta.use_projection = True
+        self.addCleanup( setattr, d.activity_resource._meta, 'use_projection', False )
+
+        d.request.cache = DocumentCache()
+        d.request.matchdict = {}
+        response = d.activity_resource.dispatch_list( d.request )
+        deserialized = json_loads( response.body )
+
+        # Every field is dehydrated from the projected documents
+        self.assertEqual( len( deserialized['objects'] ), 1 )
+        activity = deserialized['objects'][ 0 ]
+        self.assertEqual( activity['id'], self.a1_id )
+        self.assertEqual( activity['resource_uri'], '/api/v1/activity/{0}/'.format( self.a1_id ) )
+        self.assertEqual( activity['name'], 'a1' )
+        self.assertEqual( activity['finished'], False )
+        self.assertEqual( activity['tags'], [] )
+        self.assertEqual( d.api.get_id_from_resource_uri( activity['person'] ), self.user_id )
+
+        # The partially loaded documents are kept out of the request's document cache
+        self.assertNotIn( self.a1.pk, d.request.cache )
+
     def test_post_list( self ):
         d = self.data
 
-        d.request.body = json.dumps({
-            'name': 'post_list created activity',
-            'person': d.person_resource.get_resource_uri( d.request, d.user )
-        })
+        d.request.body = self.post_list_body
 
         # Create a new activity
         response = d.activity_resource.post_list( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
         self.assertIn( 'id', deserialized )
 
         # Find out if it was indeed created:
         d.request.matchdict = { 'name': 'post_list created activity'}
         response = d.activity_resource.dispatch_single( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         # Check if the correct activity has been returned
         self.assertEqual( deserialized['name'], "post_list created activity")
@@ -101,21 +205,24 @@ class BasicTests( unittest.TestCase ):
 
         self.assertEqual( len( deliverable.activities ), 1 )
 
+        deliverable_id = unicode( deliverable.pk )
+        deliverable_uri = d.deliverable_resource.get_resource_uri( d.request, deliverable )
+
         # Change the deliverable's name to `d2`
         request = get_request( d.user,
-            path=d.deliverable_resource.get_resource_uri( d.request, deliverable ),
+            path=deliverable_uri,
             request_method='PUT',
-            body=json.dumps({
+            json_body={
                 'name': 'd2',
-                'id': str( deliverable.pk ),
-                'resource_uri': d.deliverable_resource.get_resource_uri( d.request, deliverable ),
-                'owner': d.person_resource.get_resource_uri( d.request, d.user )
-            })
+                'id': deliverable_id,
+                'resource_uri': deliverable_uri,
+                'owner': d.user_uri
+            }
         )
 
         # Update the deliverable
         response = d.deliverable_resource.put_single( request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         deliverable.reload()
 
@@ -124,13 +231,13 @@ class BasicTests( unittest.TestCase ):
 
         # Change the name again, this time to `d3`
         request = get_request( d.user,
-            path=d.deliverable_resource.get_resource_uri( d.request, deliverable ),
+            path=deliverable_uri,
             request_method='PUT',
-            body=json.dumps({
+            json_body={
                 'name': 'd3',
-                'id': str( deliverable.pk ),
-                'resource_uri': d.deliverable_resource.get_resource_uri( d.request, deliverable )
-            })
+                'id': deliverable_id,
+                'resource_uri': deliverable_uri
+            }
         )
 
         # Update the deliverable
@@ -144,19 +251,20 @@ class BasicTests( unittest.TestCase ):
     def test_post_nested_list( self ):
         d = self.data
 
-        d.request.body = json.dumps({
+        d.request.body = json_dumps({
             'name': 'post_list created activity',
             'person': {
                 'name': 'nested person'
             }
         })
 
-        # we want to return the nested person as well:
+        # we want to return the nested person as well; the resource is shared, so reset that afterwards:
         d.activity_resource.fields[ 'person' ].full = True
+        self.addCleanup( setattr, d.activity_resource.fields[ 'person' ], 'full', False )
 
         # Create a new activity
         response = d.activity_resource.post_list( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         self.assertIn( 'id', deserialized )
         self.assertEqual( deserialized['name'], 'post_list created activity' )
@@ -169,7 +277,7 @@ class BasicTests( unittest.TestCase ):
         # # Find out if the activity was indeed created:
         d.request.matchdict = { 'name': 'post_list created activity'}
         response = d.activity_resource.dispatch_single( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         # Check if the correct activity has been returned
         self.assertEqual( deserialized['name'], 'post_list created activity' )
@@ -181,19 +289,20 @@ class BasicTests( unittest.TestCase ):
 
         # Now we post the same activity, with the same person nested in it, and change the name fields on them. In this
         # way, we test whether the fields and specifically the related field's fields are correctly dehydrated and saved
-        d.request.body = json.dumps({
-            'id': str( deserialized['id'] ),
-            'resource_uri': '/api/v1/person/' + str( deserialized['id'] ) + '/',
+        # Ids decoded from the response are already strings.
+        d.request.body = json_dumps({
+            'id': deserialized['id'],
+            'resource_uri': '/api/v1/person/{0}/'.format( deserialized['id'] ),
             'name': 'new name activity',
             'person': {
-                'id': str( person['id'] ),
-                'resource_uri': '/api/v1/person/' + str( person['id'] ) + '/',
+                'id': person['id'],
+                'resource_uri': '/api/v1/person/{0}/'.format( person['id'] ),
                 'name': 'new name'
             }
         })
 
         response = d.activity_resource.post_list( d.request )
-        deserialized_2 = json.loads( response.body )
+        deserialized_2 = json_loads( response.body )
 
         self.assertIn( 'id', deserialized_2 )
         self.assertEqual( deserialized['id'], deserialized_2['id'] )
@@ -2,19 +2,22 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import unittest
-from pyramid import testing
 
-from tests_tastymongo.run_tests import setup_db, setup_request
+from tests_tastymongo.run_tests import connect_db, setup_db, setup_request, teardown_request
 
 
-class HasOneTests( unittest.TestCase ):
+def setUpModule():
+    connect_db()
+
+
+class HasManyTests( unittest.TestCase ):
 
     def setUp( self ):
         self.conn = setup_db()
         self.data = setup_request()
 
     def tearDown( self ):
-        testing.tearDown()
+        teardown_request( self.data )
 
         # Clear data
         self.data = None
@@ -2,22 +2,43 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import unittest
-import json
-from pyramid import testing
+from copy import copy
 
-from tests_tastymongo.run_tests import setup_db, setup_request
+from tests_tastymongo.utils import json_loads
+from tests_tastymongo.run_tests import connect_db, setup_db, setup_request, teardown_request, get_request, insert_documents, fetch_field
 
 from tests_tastymongo.documents import Activity, Person
 
 
+def setUpModule():
+    connect_db()
+
+
 class HasOneTests( unittest.TestCase ):
 
+    @classmethod
+    def setUpClass( cls ):
+        cls.conn = setup_db()
+
+        # A single pyramid registry, api, set of resources and user for all tests in this class
+        cls.shared_data = setup_request()
+
+    @classmethod
+    def tearDownClass( cls ):
+        teardown_request( cls.shared_data )
+        cls.shared_data = None
+
     def setUp( self ):
-        self.conn = setup_db()
-        self.data = setup_request()
+        # Every test gets its own request
+        self.data = copy( self.shared_data )
+        self.data.request = get_request( self.data.user )
 
     def tearDown( self ):
-        testing.tearDown()
+        # Tests rename the user and create activities; restore the user and remove everything else
+        user_pk = self.shared_data.user.pk
+        Person._get_collection().update_one( { '_id': user_pk }, { '$set': { 'name': 'p1' } } )
+        Person._get_collection().delete_many( { '_id': { '$ne': user_pk } } )
+        Activity._get_collection().delete_many( {} )
 
         # Clear data
         self.data = None
@@ -25,45 +46,42 @@ class HasOneTests( unittest.TestCase ):
     def test_create_single_and_modify_nested_document( self ):
         d = self.data
 
-        user_uri = d.person_resource.get_resource_uri( d.request, d.user )
+        user_uri = d.user_uri
 
-        user = Person.objects.get( id=d.user.pk )
-        self.assertEqual( user.name, 'p1' )
+        self.assertEqual( fetch_field( Person, d.user.pk, 'name' ), 'p1' )
 
-        d.request.body = json.dumps({
+        d.request = get_request( d.user, request_method='POST', json_body={
             'name': 'post_list created activity',
             'person': { 'resource_uri': user_uri, 'name': 'p2' }
         })
 
         response = d.activity_resource.post_list( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         self.assertEqual( deserialized['person'], user_uri )
 
-        user = Person.objects.get( id=d.user.pk )
-        self.assertEqual( user.name, 'p2' )
+        self.assertEqual( fetch_field( Person, d.user.pk, 'name' ), 'p2' )
 
     def test_update_single_and_modify_nested_document( self ):
         d = self.data
 
-        user_uri = d.person_resource.get_resource_uri( d.request, d.user )
+        user_uri = d.user_uri
+
+        # Setup data; it only needs to exist, so insert it with pymongo
+        d.a1 = insert_documents( Activity, [ { 'name': 'a1', 'person': d.user.pk } ] )[ 0 ]
 
-        # Setup data
-        d.a1 = Activity( name='a1', person=d.user )
-        d.a1.save()
+        a1_uri = d.activity_resource.get_resource_uri( d.request, d.a1 )
 
-        user = Person.objects.get( id=d.user.pk )
-        self.assertEqual( user.name, 'p1' )
+        self.assertEqual( fetch_field( Person, d.user.pk, 'name' ), 'p1' )
 
-        d.request.body = json.dumps({
-            'resource_uri': d.activity_resource.get_resource_uri( d.request, d.a1 ),
+        d.request = get_request( d.user, request_method='POST', json_body={
+            'resource_uri': a1_uri,
             'person': { 'resource_uri': user_uri, 'name': 'p2' }
         })
 
         response = d.activity_resource.post_list( d.request )
-        deserialized = json.loads( response.body )
+        deserialized = json_loads( response.body )
 
         self.assertEqual( deserialized['person'], user_uri )
 
-        user = Person.objects.get( id=d.user.pk )
-        self.assertEqual( user.name, 'p2' )
+        self.assertEqual( fetch_field( Person, d.user.pk, 'name' ), 'p2' )
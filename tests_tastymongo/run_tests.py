@@ -1,6 +1,9 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import atexit
+import os
+import sys
 import unittest
 
 import mongoengine
@@ -10,63 +13,189 @@ from pyramid.request import Request
 
 from tastymongo.api import Api
 
-from tests_tastymongo.utils import Struct
+from tests_tastymongo.utils import Struct, json_dumps
 from tests_tastymongo.documents import Person
 from tests_tastymongo.resources import ActivityResource, PersonResource, DeliverableResource, AllFieldsDocumentResource
 
 
+DEFAULT_DB_NAME = 'tastymongo_test'
+
+def get_db_name():
+    '''
+    Returns the name of the test database. When tests run in pytest-xdist
+    workers, each worker gets a database of its own.
+    '''
+    if os.environ.get( 'PYTEST_XDIST_WORKER' ):
+        return 'tastymongo_test_{}'.format( os.environ[ 'PYTEST_XDIST_WORKER' ] )
+
+    return DEFAULT_DB_NAME
+
+# The connection to the test database, once `connect_db` has been called
+_CONN = None
+
+def connect_db():
+    '''
+    Registers the test database and opens its connection right away, so the
+    first query in a test doesn't pay for connecting to the server. Later
+    calls return the same connection.
+    '''
+    global _CONN
+
+    if _CONN is None:
+        mongoengine.register_connection( mongoengine.DEFAULT_CONNECTION_NAME, get_db_name() )
+        _CONN = mongoengine.connection.get_connection()
+        _CONN.admin.command( 'ping' )
+
+        if get_db_name() != DEFAULT_DB_NAME:
+            # Nothing else uses a worker's database, so drop it when the worker is done
+            atexit.register( _CONN.drop_database, get_db_name() )
+
+    return _CONN
+
 def setup_db( drop=True ):
-    mongoengine.register_connection( mongoengine.DEFAULT_CONNECTION_NAME, 'tastymongo_test' )
-    c = mongoengine.connection.get_connection()
+    c = connect_db()
 
     if drop:
-        c.drop_database( 'tastymongo_test' )
+        # Empty the collections rather than dropping the database, which
+        # keeps the collections and their indexes around for the next test.
+        db = c.get_database( get_db_name() )
+        for name in db.list_collection_names():
+            if not name.startswith( 'system.' ):
+                db[ name ].delete_many( {} )
 
     return c
 
+def insert_documents( document_class, sons ):
+    '''
+    Inserts raw `sons` for `document_class` in a single round-trip, bypassing
+    MongoEngine's validation, and returns them as documents.
+    '''
+    document_class._get_collection().insert_many( sons, ordered=False )
+    return [ document_class._from_son( son ) for son in sons ]
+
+def fetch_field( document_class, pk, field ):
+    '''
+    Returns the stored value of `field` for the `document_class` document
+    with `pk`, fetching only that field from the database.
+    '''
+    son = document_class._get_collection().find_one( { '_id': pk }, { field: 1 } )
+    return son.get( field ) if son else None
+
+# A single configurator (and registry) for all tests
+_CONFIG = None
+
+def get_config():
+    '''
+    Returns the configurator shared by all tests. `setup_request` makes it
+    current with `begin`; `teardown_request` undoes that with `end`.
+    '''
+    global _CONFIG
+
+    if _CONFIG is None:
+        _CONFIG = testing.setUp()
+        _CONFIG.end()
+
+    return _CONFIG
+
+def teardown_request( d ):
+    '''
+    Undoes `setup_request`. Unlike `testing.tearDown`, this keeps the shared
+    registry intact for the next test.
+    '''
+    d.config.end()
+
+# Resource instances by class, shared by all tests. Tests that change a
+# resource (its fields or meta) should restore it afterwards.
+_resources = {}
+
+def _resource( resource_class ):
+    if resource_class not in _resources:
+        _resources[ resource_class ] = resource_class()
+
+    return _resources[ resource_class ]
+
+# The Api shared by all tests, on the shared configurator
+_API = None
+
+def get_api():
+    '''
+    Returns the Api shared by all tests, with the test resources registered.
+    '''
+    global _API
+
+    if _API is None:
+        _API = Api( get_config() )
+        _API.register_many( [ _resource( ActivityResource ), _resource( DeliverableResource ),
+            _resource( PersonResource ), _resource( AllFieldsDocumentResource ) ] )
+
+    return _API
+
 def setup_request( user=None ):
     d = Struct()
 
     # Setup application/request config
     d.request = get_request( user )
-    d.config = testing.setUp( request=d.request )
-
-    # Setup our API
-    d.api = Api( d.config )
+    d.config = get_config()
+    d.config.begin( request=d.request )
 
-    # Create some resources
-    d.activity_resource = ActivityResource()
-    d.deliverable_resource = DeliverableResource()
-    d.person_resource = PersonResource()
-    d.allfieldsdocument_resource = AllFieldsDocumentResource()
-    d.api.register( d.activity_resource )
-    d.api.register( d.deliverable_resource )
-    d.api.register( d.person_resource )
-    d.api.register( d.allfieldsdocument_resource )
+    # Our API and its resources
+    d.api = get_api()
+    d.activity_resource = _resource( ActivityResource )
+    d.deliverable_resource = _resource( DeliverableResource )
+    d.person_resource = _resource( PersonResource )
+    d.allfieldsdocument_resource = _resource( AllFieldsDocumentResource )
 
     if user is not False:
         if user:
             d.user = user
         else:
-            d.user = Person( name='p1', defaults={ 'email': 'p1@progressivecompany.com', 'password': 'p1' } )
-            d.user.save()
+            # The collections may have been emptied since the last call, so insert a fresh user,
+            # but skip MongoEngine's validation and save path.
+            d.user = insert_documents( Person, [ { 'name': 'p1' } ] )[ 0 ]
 
         d.request.user = d.user
-        policy = d.config.testing_securitypolicy( userid=str( d.user.pk ) ) #, permissive=True )
+        d.user_id_str = str( d.user.pk )
+        d.user_uri = d.person_resource.get_resource_uri( d.request, d.user )
+
+        policy = d.config.testing_securitypolicy( userid=d.user_id_str ) #, permissive=True )
         d.config.set_authentication_policy( policy )
 
     return d
 
-def get_request( user=None, path='/api/v1/', body=b'', request_method='GET' ):
-    request = Request.blank( path )
+# Blank requests per path; each `get_request` copies one instead of building a new environ.
+_request_prototypes = {}
+
+def get_request( user=None, path='/api/v1/', body=b'', request_method='GET', json_body=None ):
+    '''
+    Returns a new request for `path`. Its body is `body`, or `json_body`
+    serialized to JSON if given.
+    '''
+    if path not in _request_prototypes:
+        _request_prototypes[ path ] = Request.blank( path )
+
+    request = _request_prototypes[ path ].copy_get()
     request.method = request_method
     request.user = user
-    request.body = str(body)
+
+    if json_body is not None:
+        body = json_dumps( json_body )
+
+    request.body = body if isinstance( body, bytes ) else body.encode( 'utf-8' )
 
     return request
 
 
 if __name__ == '__main__':
-    test_loader = unittest.defaultTestLoader.discover( '.' )
+    try:
+        import pytest
+        import xdist
+    except ImportError:
+        pass
+    else:
+        # Run the tests in pytest-xdist workers. Test classes set up their fixtures once
+        # in `setUpClass`, so keep each class's tests together on one worker.
+        sys.exit( pytest.main( [ '-n', 'auto', '--dist=loadscope', '-o', 'python_files=test*.py', '.' ] ) )
+
+    suite = unittest.defaultTestLoader.discover( '.' )
     test_runner = unittest.TextTestRunner()
-    test_runner.run( test_loader )
\ No newline at end of file
+    test_runner.run( suite )
\ No newline at end of file
@@ -1,9 +1,10 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import os
 import unittest
-
-from pyramid import testing
+from copy import copy
+from itertools import product
 
 from tastymongo.constants import *
 from tastymongo.exceptions import InvalidFilterError
@@ -11,12 +12,102 @@ from tastymongo.exceptions import InvalidFilterError
 from bson import ObjectId
 from tests_tastymongo.documents import AllFieldsDocument, EmbeddedDoc
 from tests_tastymongo.resources import AllFieldsDocumentResource
-from tests_tastymongo.run_tests import setup_db, setup_request
+from tests_tastymongo.run_tests import connect_db, setup_db, setup_request, teardown_request, get_request
 
 from decimal import Decimal
 import datetime
 
 
+def setUpModule():
+    connect_db()
+
+
+# All fields on AllFieldsDocumentResource
+_DOCUMENT_FIELDS = frozenset(( 'id_field', 'string_field', 'int_field', 'float_field', 'decimal_field',
+    'boolean_field', 'list_field', 'dict_field', 'document_field', 'date_field', 'datetime_field', 'time_field',
+    'to_one_field', 'to_many_field', 'to_one_field_not_on_resource', 'to_many_field_not_on_resource' ))
+
+# Fields the size operator applies to, and those it doesn't
+_SIZE_ALLOWED = frozenset(( 'list_field', 'dict_field', 'document_field', 'to_many_field' ))
+_SIZE_DISALLOWED = _DOCUMENT_FIELDS - _SIZE_ALLOWED
+
+
+def _filter_keys( field, operators ):
+    '''
+    Returns the filter keys for `field` with each of `operators`.
+    '''
+    return tuple( field + '__' + filter_type for filter_type in operators )
+
+# Filter keys per field for the equality and list operators, built once for all tests
+_EQUALITY_KEYS = { field: _filter_keys( field, QUERY_EQUALITY_OPERATORS ) for field in _DOCUMENT_FIELDS }
+_LIST_KEYS = { field: _filter_keys( field, QUERY_LIST_OPERATORS ) for field in _DOCUMENT_FIELDS }
+
+# Keys for filtering a to-many relation on ids
+_TO_MANY_NOT_ON_RESOURCE_KEYS = _filter_keys( 'to_many_field_not_on_resource', frozenset(( 'exact', 'ne' )) | QUERY_LIST_OPERATORS )
+
+# ( field, filter_type, filter key ) tables for the tests that loop over fields and filter types
+_MATCH_CASES_DISALLOWED = [ ( field, filter_type, field + '__' + filter_type )
+    for field, filter_type in product( _DOCUMENT_FIELDS - { 'string_field' }, QUERY_MATCH_OPERATORS ) ]
+_MATCH_CASES_STRING = [ ( 'string_field', filter_type, 'string_field__' + filter_type )
+    for filter_type in QUERY_MATCH_OPERATORS ]
+_COMPLEX_FIELD_CASES = [ ( field, filter_type, field + '__' + filter_type )
+    for field, filter_type in product( ( 'list_field', 'dict_field', 'document_field' ), QUERY_EQUALITY_OPERATORS | QUERY_LIST_OPERATORS ) ]
+_SIZE_CASES_DISALLOWED = [ ( field, 'size', field + '__size' ) for field in _SIZE_DISALLOWED ]
+_SIZE_KEYS = [ field + '__size' for field in _SIZE_ALLOWED ]
+_RELATIONAL_LOOKUP_KEYS = [ ( 'to_one_field__' + field + '__exists', 'to_one_field__to_one_field__' + field + '__exists' )
+    for field in _DOCUMENT_FIELDS ]
+
+# Values for the numeric field filters, and their string form as passed in a filter
+_NUMERIC_VECTORS = ( -1.9, -1.2, -1, 0, 0.0, 3, 3.2, 3.9, 3.4999999999999999999999999999999999999999999 )
+_STRING_NUMERIC_VECTORS = tuple( str( value ) for value in _NUMERIC_VECTORS )
+
+# Filters that match the fixture document, run against MongoDB on every run by `test_filters_execute_against_mongo`
+_SMOKE_FILTERS = (
+    ( 'string_field__icontains', 'hello' ),
+    ( 'int_field__gt', '3' ),
+    ( 'list_field__size', 2 ),
+    ( 'to_one_field__string_field__exists', 'True' ),
+)
+
+# One representative filter per field type, run against MongoDB by `test_all_filters_execute_against_mongo`
+_INTEGRATION_FILTERS = (
+    ( 'id_field__in', str( ObjectId() ) ),
+    ( 'string_field__icontains', 'hello' ),
+    ( 'int_field__gt', '3' ),
+    ( 'float_field__lte', '4.5' ),
+    ( 'decimal_field__in', '1.333333' ),
+    ( 'boolean_field__exact', 'True' ),
+    ( 'list_field__size', 2 ),
+    ( 'dict_field__exists', 'True' ),
+    ( 'document_field__size', 0 ),
+    ( 'to_one_field__exact', 'null' ),
+    ( 'to_many_field__all', str( ObjectId() ) ),
+    ( 'to_one_field__string_field__exists', 'True' ),
+    ( 'to_many_field_not_on_resource__in', str( ObjectId() ) ),
+)
+
+
+def _scalar_cases( field, equality_cases, list_value, list_expected ):
+    '''
+    Returns ( filter key, value, expected ) cases for a scalar `field`: every ( value, expected ) pair in
+    `equality_cases` for each equality operator, and `list_value` parsing to `list_expected` for each list operator.
+    '''
+    return [ ( key, value, expected ) for key in _EQUALITY_KEYS[ field ] for value, expected in equality_cases ] + \
+        [ ( key, list_value, list_expected ) for key in _LIST_KEYS[ field ] ]
+
+# ( filter key, value, expected ) cases for the scalar fields, checked by `test_scalar_field_filters`
+_FILTER_CASES = tuple(
+    # we pick the string 'None' which should not be recognized as anything but a string
+    _scalar_cases( 'string_field', [ ( 'None', 'None' ) ], 'None', [ 'None' ] ) +
+    # values get rounded to the nearest int
+    _scalar_cases( 'int_field', [ ( value_str, round( value ) ) for value_str, value in zip( _STRING_NUMERIC_VECTORS, _NUMERIC_VECTORS ) ],
+        str( 3 ), [ 3 ] ) +
+    _scalar_cases( 'float_field', zip( _STRING_NUMERIC_VECTORS, _NUMERIC_VECTORS ), str( 3.9 ), [ 3.9 ] ) +
+    _scalar_cases( 'decimal_field', [ ( '4.8', Decimal( '4.8' ) ) ], '4.9', [ Decimal( '4.9' ) ] ) +
+    _scalar_cases( 'boolean_field', [ ( str( True ), True ), ( str( False ), False ), ( 'null', None ) ], str( True ), [ True ] )
+)
+
+
 class BasicTests( unittest.TestCase ):
     """
     Given TastyMongo's set of fields and allowed query operators, there are plenty of different filtering possibilities.
@@ -47,17 +138,21 @@ class BasicTests( unittest.TestCase ):
     """
     # TODO: Date / Datetime / Timefield filter testing
 
-    def setUp( self ):
-        self.conn = setup_db()
-        self.data = setup_request()
+    @classmethod
+    def setUpClass( cls ):
+        cls.conn = setup_db()
+
+        # The tests only read, so they share the request setup and the document
+        cls.shared_data = setup_request()
 
         # Insert a document
-        self.data.document = AllFieldsDocument(
+        document = AllFieldsDocument(
+            id = ObjectId(),
             id_field = ObjectId(),
             string_field = 'hello world',
             int_field = 4,
             float_field = 4.5,
-            decimal_field = Decimal( 4 / 3 ),
+            decimal_field = Decimal( '1.333333' ),
             boolean_field = True,
             list_field = [ 'hello', 'world' ],
             dict_field = { 'hello': 'world' },
@@ -68,28 +163,70 @@ class BasicTests( unittest.TestCase ):
             to_one_field = None,
             to_many_field = None
         )
-        # we need to save before we can set a recursive relation:
-        self.data.document.save()
-        self.data.document.to_one_field = self.data.document
-        self.data.document.to_many_field = [ self.data.document ]
-        self.data.document.to_one_field_not_on_resource = self.data.document
-        self.data.document.to_many_field_not_on_resource = [ self.data.document ]
-        self.data.document.save()
+        # the id is assigned up front, so the recursive relations can be set before the only save:
+        document.to_one_field = document
+        document.to_many_field = [ document ]
+        document.to_one_field_not_on_resource = document
+        document.to_many_field_not_on_resource = [ document ]
+        # the values above are known to be valid, so skip validating them
+        document.save( validate=False, clean=False )
+        cls.shared_data.document = document
 
         # the api url is needed to parse resource_uris
-        self.data.api_url = self.data.allfieldsdocument_resource._meta.api.route
-
-        self.data.resource = AllFieldsDocumentResource()
+        cls.shared_data.api_url = cls.shared_data.allfieldsdocument_resource._meta.api.route
+
+        # Formats the resource uri for an id; the api url part is filled in once
+        cls.resource_uri_for = '{0}/allfieldsdocument/{{0}}/'.format( cls.shared_data.api_url ).format
+
+        cls.shared_data.resource = AllFieldsDocumentResource()
+
+    @classmethod
+    def tearDownClass( cls ):
+        teardown_request( cls.shared_data )
+        cls.shared_data = None
+
+        # Remove the shared document once, after the last test
+        AllFieldsDocument._get_collection().delete_many( {} )
+
+    def _assertOneKey( self, query, key, expected, msg=None ):
+        '''
+        Asserts that `query` is the single filter `key` with value `expected`.
+        '''
+        # `assertEqual` on dicts goes through `assertDictEqual`; a one-item tuple compares directly
+        self.assertEqual( tuple( query.items() ), ( ( key, expected ), ), msg )
+
+    def _check_oid_cases( self, keys, wrap_in_list, allow_null=False, extra_cases=() ):
+        '''
+        Checks that, for each filter key in `keys`, a filter passes an ObjectId on as is, parses an ObjectId from both a
+        plain id and a resource uri (and `null` to None if `allow_null`), and rejects other strings. `extra_cases` holds
+        additional ( value, expected ) pairs.
+        '''
+        object_id = ObjectId()
+        cases = [
+            ( object_id, object_id ),
+            ( str( object_id ), object_id ),
+            ( self.resource_uri_for( object_id ), object_id )
+        ]
+        if allow_null:
+            cases.append( ( 'null', None ) )
+
+        cases = [ ( value, [ parsed ] if wrap_in_list else parsed ) for value, parsed in cases ]
+        cases.extend( extra_cases )
+
+        for key in keys:
+            for value, expected in cases:
+                q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+                self._assertOneKey( q_filter.query, key, expected, key )
 
-        # all tastymongo fields:
-        self.data.document_fields = { 'id_field', 'string_field', 'int_field', 'float_field', 'decimal_field',
-        'boolean_field', 'list_field', 'dict_field', 'document_field', 'date_field', 'datetime_field', 'time_field',
-        'to_one_field', 'to_many_field', 'to_one_field_not_on_resource', 'to_many_field_not_on_resource' }
+            with self.assertRaises( InvalidFilterError ):
+                q_filter = self.data.allfieldsdocument_resource.build_filters( { key: 'should fail' }, None )
 
+    def setUp( self ):
+        # Every test gets its own request
+        self.data = copy( self.shared_data )
+        self.data.request = get_request( self.data.user )
 
     def tearDown( self ):
-        testing.tearDown()
-
         # Clear data
         self.data = None
 
@@ -99,19 +236,16 @@ class BasicTests( unittest.TestCase ):
         Match operators only work on strings, so proper filters should be built only for string fields
         """
 
-        disallowed_fields = self.data.document_fields - { 'string_field' }
-
-        for filter_type in QUERY_MATCH_OPERATORS:
-
-            # check that the filtering gets rejected for fields that are not string fields:
-            for field in disallowed_fields:
-                with self.assertRaises( InvalidFilterError ):
-                    q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: None }, None )
+        # check that the filtering gets rejected for fields that are not string fields. Only the filter
+        # expression decides that, so check it without parsing a value or building a query:
+        for field, filter_type, key in _MATCH_CASES_DISALLOWED:
+            with self.assertRaises( InvalidFilterError ):
+                self.data.allfieldsdocument_resource._compile_filter( key )
 
-            # and that we get a decent q_filter for string fields:
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'string_field' + '__' + filter_type: 'hello world' }, None )
-            self.assertDictEqual( q_filter.query, { 'string_field__' + filter_type: 'hello world' } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        # and that we get a decent q_filter for string fields:
+        for field, filter_type, key in _MATCH_CASES_STRING:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: 'hello world' }, None )
+            self._assertOneKey( q_filter.query, key, 'hello world', key )
 
     def test_size_filter( self ):
         """
@@ -119,219 +253,73 @@ class BasicTests( unittest.TestCase ):
         otherwise
         """
 
-        allowed_fields = { 'list_field', 'dict_field', 'document_field', 'to_many_field' }
-        disallowed_fields = self.data.document_fields - allowed_fields
-
         # check that the filtering gets rejected for fields that are not allowed:
-        for field in disallowed_fields:
+        for field, filter_type, key in _SIZE_CASES_DISALLOWED:
             with self.assertRaises( InvalidFilterError ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__size': 5 }, None )
+                self.data.allfieldsdocument_resource._compile_filter( key )
 
         # and that we get a decent query for allowed fields:
-        for field in allowed_fields:
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__size': 5 }, None )
-            self.assertDictEqual( q_filter.query, { field + '__size': 5 } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_objectid_and_to_one_field_filter( self ):
-        object_id = ObjectId()
-
-        for field in ( 'id_field', 'to_one_field' ):
-
-            for filter_type in QUERY_EQUALITY_OPERATORS:
-
-                value = str( object_id )
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-                self.assertDictEqual( q_filter.query, { field + '__' + filter_type: object_id } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-                value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-                self.assertDictEqual( q_filter.query, { field + '__' + filter_type: object_id } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-                if field == 'to_one_field':
-                    value = 'null'
-                    q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-                    self.assertDictEqual( q_filter.query, { field + '__' + filter_type: None } )
-                    result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-                value = 'should fail'
-                with self.assertRaises( InvalidFilterError ):
-                    q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-
-            for filter_type in QUERY_LIST_OPERATORS:
-
-                value = str( object_id )
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-                self.assertDictEqual( q_filter.query, { field + '__' + filter_type: [ object_id ] } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-                value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-                self.assertDictEqual( q_filter.query, { field + '__' + filter_type: [ object_id ] } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-                value = 'should fail'
-                with self.assertRaises( InvalidFilterError ):
-                    q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: value }, None )
-
-                id_list = [ ObjectId(), ObjectId() ]
-                stringed_id_list = [ str( value ) for value in id_list ]
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: stringed_id_list }, None )
-                self.assertDictEqual( q_filter.query, { field + '__' + filter_type: id_list } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_string_field_filter( self ):
-
-        for filter_type in QUERY_EQUALITY_OPERATORS:
-
-            # we pick the string 'None' which should not be recognized as anything but a string
-            value = 'None'
-
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'string_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'string_field__' + filter_type: value } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = 'None'
-
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'string_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'string_field__' + filter_type: [ value ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_int_field_filter( self ):
-
-        for filter_type in QUERY_EQUALITY_OPERATORS:
-
-            for value in ( -1.9, -1.2, -1, 0, 0.0, 3, 3.2, 3.9, 3.4999999999999999999999999999999999999999999 ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'int_field__' + filter_type: str( value ) }, None )
-                self.assertDictEqual( q_filter.query, { 'int_field__' + filter_type: round( value ) } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = 3
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'int_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'int_field__' + filter_type: [ value ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_float_field_filter( self ):
-
-        for filter_type in QUERY_EQUALITY_OPERATORS:
+        for key in _SIZE_KEYS:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: 5 }, None )
+            self._assertOneKey( q_filter.query, key, 5 )
 
-            for value in ( -1.9, -1.2, -1, 0, 0.0, 3, 3.2, 3.9, 3.4999999999999999999999999999999999999999999 ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'float_field__' + filter_type: str( value ) }, None )
-                self.assertDictEqual( q_filter.query, { 'float_field__' + filter_type: value } )
-                result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = 3.9
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'float_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'float_field__' + filter_type: [ value ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_decimal_field_filter( self ):
-
-        for filter_type in QUERY_EQUALITY_OPERATORS:
-
-            value = Decimal( 4.8 )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'decimal_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'decimal_field__' + filter_type: value } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = Decimal( 4.9 )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'decimal_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'decimal_field__' + filter_type: [ value ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-    def test_boolean_field_filter( self ):
+    def test_filters_execute_against_mongo( self ):
+        """
+        The other tests only check the query a filter parses to; check that a few filters find the fixture document
+        """
+        queryset = self.data.resource.get_queryset( self.data.request )
 
-        for filter_type in QUERY_EQUALITY_OPERATORS:
+        for key, value in _SMOKE_FILTERS:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            ids = [ document.id for document in queryset.filter( q_filter ) ]
+            self.assertEqual( ids, [ self.data.document.id ], key )
 
-            value = True
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'boolean_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'boolean_field__' + filter_type: value } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+    @unittest.skipUnless( os.environ.get( 'INTEGRATION_FILTER_TESTS' ), 'set INTEGRATION_FILTER_TESTS to run all filters against MongoDB' )
+    def test_all_filters_execute_against_mongo( self ):
+        """
+        Check that MongoDB accepts one filter per field type, and every scalar field filter case
+        """
+        queryset = self.data.resource.get_queryset( self.data.request )
+        filters = list( _INTEGRATION_FILTERS ) + [ ( key, value ) for key, value, expected in _FILTER_CASES ]
 
-            value = False
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'boolean_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'boolean_field__' + filter_type: value } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        for key, value in filters:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            list( queryset.filter( q_filter ) )
 
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'boolean_field__' + filter_type: 'null' }, None )
-            self.assertDictEqual( q_filter.query, { 'boolean_field__' + filter_type: None } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+    def test_objectid_and_to_one_field_filter( self ):
+        id_list = [ ObjectId(), ObjectId() ]
+        stringed_id_list = [ str( value ) for value in id_list ]
 
-        for filter_type in QUERY_LIST_OPERATORS:
+        for field in ( 'id_field', 'to_one_field' ):
+            self._check_oid_cases( _EQUALITY_KEYS[ field ], wrap_in_list=False, allow_null=( field == 'to_one_field' ) )
+            self._check_oid_cases( _LIST_KEYS[ field ], wrap_in_list=True, extra_cases=[ ( stringed_id_list, id_list ) ] )
 
-            value = True
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'boolean_field__' + filter_type: str( value ) }, None )
-            self.assertDictEqual( q_filter.query, { 'boolean_field__' + filter_type: [ value ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+    def test_scalar_field_filters( self ):
+        """
+        String, int, float, decimal and boolean filters parse their values to the field's type
+        """
+        for key, value, expected in _FILTER_CASES:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            self._assertOneKey( q_filter.query, key, expected, key )
 
     def test_to_one_field_filter( self ):
+        id_list = [ ObjectId(), ObjectId() ]
+        stringed_id_list = [ str( value ) for value in id_list ]
 
-        for filter_type in QUERY_EQUALITY_OPERATORS:
-
-            object_id = ObjectId()
-
-            value = str( object_id )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: object_id } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: object_id } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = 'null'
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: None } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = 'should fail'
-            with self.assertRaises( InvalidFilterError ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = str( object_id )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = 'should fail'
-            with self.assertRaises( InvalidFilterError ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: value }, None )
-
-            id_list = [ ObjectId(), ObjectId() ]
-            stringed_id_list = [ str( value ) for value in id_list ]
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + filter_type: stringed_id_list }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__' + filter_type: id_list } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        self._check_oid_cases( _EQUALITY_KEYS[ 'to_one_field' ], wrap_in_list=False, allow_null=True )
+        self._check_oid_cases( _LIST_KEYS[ 'to_one_field' ], wrap_in_list=True, extra_cases=[ ( stringed_id_list, id_list ) ] )
 
     def test_relational_look_up_filter( self ):
 
-        for field in self.data.document_fields:
+        expected = [ str( self.data.document.id ) ]
 
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__' + field + '__exists': 'True' }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__in': [ str( self.data.document.id ) ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        for key, nested_key in _RELATIONAL_LOOKUP_KEYS:
 
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field__to_one_field__' + field + '__exists': 'True' }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field__in': [ str( self.data.document.id ) ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: 'True' }, None )
+            self._assertOneKey( q_filter.query, 'to_one_field__in', expected, key )
+
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { nested_key: 'True' }, None )
+            self._assertOneKey( q_filter.query, 'to_one_field__in', expected, nested_key )
 
     def test_filtering_on_unregistered_related_fields( self ):
         """
@@ -343,30 +331,26 @@ class BasicTests( unittest.TestCase ):
         object_id = ObjectId()
         value = str( object_id )
 
-        for filter_type in QUERY_EQUALITY_OPERATORS:
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field_not_on_resource__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field_not_on_resource__' + filter_type: object_id } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-        for filter_type in  QUERY_LIST_OPERATORS:
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_one_field_not_on_resource__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_one_field_not_on_resource__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        for key in _EQUALITY_KEYS[ 'to_one_field_not_on_resource' ]:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            self._assertOneKey( q_filter.query, key, object_id )
+        for key in _LIST_KEYS[ 'to_one_field_not_on_resource' ]:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            self._assertOneKey( q_filter.query, key, [ object_id ] )
 
-        for filter_type in { 'exact', 'ne' } | QUERY_LIST_OPERATORS:
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field_not_on_resource__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field_not_on_resource__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+        for key in _TO_MANY_NOT_ON_RESOURCE_KEYS:
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: value }, None )
+            self._assertOneKey( q_filter.query, key, [ object_id ] )
 
     def test_in_empty_list( self ):
         """
         The wanted behavior of a filter like id__in=[], is to return zero. Mongo handles this well, do we?
         """
 
-        for filter_type in QUERY_LIST_OPERATORS:
+        for key in _LIST_KEYS[ 'id_field' ]:
 
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'id_field__' + filter_type: '' }, None )
-            self.assertDictEqual( q_filter.query, { 'id_field__' + filter_type: [] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
+            q_filter = self.data.allfieldsdocument_resource.build_filters( { key: '' }, None )
+            self._assertOneKey( q_filter.query, key, [] )
 
     def test_list_dict_doc_fields_filtering( self ):
         """
@@ -375,58 +359,15 @@ class BasicTests( unittest.TestCase ):
         exists.
         """
 
-        for field in ( 'list_field', 'dict_field', 'document_field' ):
-
-            for filter_type in QUERY_EQUALITY_OPERATORS | QUERY_LIST_OPERATORS:
-                with self.assertRaises( InvalidFilterError ):
-                    q_filter = self.data.allfieldsdocument_resource.build_filters( { field + '__' + filter_type: 'should fail' }, None )
+        for field, filter_type, key in _COMPLEX_FIELD_CASES:
+            with self.assertRaises( InvalidFilterError ):
+                q_filter = self.data.allfieldsdocument_resource.build_filters( { key: 'should fail' }, None )
 
     def test_to_many_field_filter( self ):
         object_id = ObjectId()
+        duplicate_ids = [ str( object_id ), str( object_id ) ]
 
-        for filter_type in ( 'exact', 'ne' ):
-
-            value = str( object_id )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = [ str( object_id ), str( object_id ) ]
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id, object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = [ 'null' ]
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = 'should fail'
-            with self.assertRaises( InvalidFilterError ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-
-        for filter_type in QUERY_LIST_OPERATORS:
-
-            value = str( object_id )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = '{0}/allfieldsdocument/{1}/'.format( self.data.api_url, str( object_id ) )
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = [ str( object_id ), str( object_id ) ]
-            q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
-            self.assertDictEqual( q_filter.query, { 'to_many_field__' + filter_type: [ object_id, object_id ] } )
-            result = list( self.data.resource.get_queryset( self.data.request ).filter( q_filter ) )
-
-            value = 'should fail'
-            with self.assertRaises( InvalidFilterError ):
-                q_filter = self.data.allfieldsdocument_resource.build_filters( { 'to_many_field__' + filter_type: value }, None )
+        self._check_oid_cases( _filter_keys( 'to_many_field', ( 'exact', 'ne' ) ), wrap_in_list=True,
+            extra_cases=[ ( duplicate_ids, [ object_id, object_id ] ), ( [ 'null' ], [] ) ] )
+        self._check_oid_cases( _LIST_KEYS[ 'to_many_field' ], wrap_in_list=True,
+            extra_cases=[ ( duplicate_ids, [ object_id, object_id ] ) ] )
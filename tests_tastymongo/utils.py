@@ -1,13 +1,31 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import json
+from operator import attrgetter
+
+# Tests encode request bodies and decode responses through these
+json_dumps = json.dumps
+json_loads = json.loads
+
 class Struct( object ):
+    # The attributes tests put on their data; slots keep instances small and cheap to copy.
+    __slots__ = ( 'request', 'config', 'api', 'activity_resource', 'deliverable_resource', 'person_resource',
+        'allfieldsdocument_resource', 'user', 'user_id_str', 'user_uri', 'a1',
+        'api_url', 'resource', 'document' )
+
     def __init__( self, **entries ):
-        self.__dict__.update( entries )
+        # Unset attributes are None, so every instance can be compared on all slots
+        for name in self.__slots__:
+            setattr( self, name, None )
+        for name, value in entries.items():
+            setattr( self, name, value )
 
     def __eq__( self, other ):
-        return self.__dict__ == other.__dict__
+        return type( other ) is Struct and _struct_values( self ) == _struct_values( other )
 
     def __ne__( self, other ):
         return not self.__eq__( other )
 
+# Returns a tuple of all of a Struct's attributes
+_struct_values = attrgetter( *Struct.__slots__ )